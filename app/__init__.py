@@ -5,4 +5,5 @@ __all__ = [
     "models",
     "schemas",
     "crud",
+    "cache",
 ]
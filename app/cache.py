@@ -0,0 +1,39 @@
+"""In-process response cache for read-mostly endpoints."""
+from __future__ import annotations
+
+from threading import Lock
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from cachetools import TTLCache
+
+T = TypeVar("T")
+
+_cache: TTLCache = TTLCache(maxsize=128, ttl=30)
+_lock = Lock()
+_generation = 0
+_MISSING = object()
+
+
+async def get_or_set(key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+    """Return the cached value for ``key``, awaiting ``factory`` to build and store it on a miss."""
+    with _lock:
+        cached = _cache.get(key, _MISSING)
+        generation = _generation
+    if cached is not _MISSING:
+        return cached  # type: ignore[return-value]
+
+    value = await factory()
+
+    with _lock:
+        # Do not store a value computed before a concurrent write cleared the cache.
+        if generation == _generation:
+            _cache[key] = value
+    return value
+
+
+def clear() -> None:
+    """Drop every cached response; call after any write that can change a listing."""
+    global _generation
+    with _lock:
+        _cache.clear()
+        _generation += 1
@@ -3,230 +3,286 @@ from __future__ import annotations
 
 from typing import List, Optional, Sequence
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Row, Select, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 from . import models, schemas
 
 
 # Practice areas -----------------------------------------------------------------
 
-def list_practice_areas(db: Session) -> List[models.PracticeArea]:
-    return db.execute(select(models.PracticeArea).order_by(models.PracticeArea.name)).scalars().all()
+async def list_practice_areas(db: AsyncSession) -> List[models.PracticeArea]:
+    stmt = select(models.PracticeArea).order_by(models.PracticeArea.name)
+    return (await db.scalars(stmt)).all()
 
 
-def get_practice_area(db: Session, practice_area_id: int) -> Optional[models.PracticeArea]:
-    return db.get(models.PracticeArea, practice_area_id)
+async def get_practice_area(db: AsyncSession, practice_area_id: int) -> Optional[models.PracticeArea]:
+    return await db.get(models.PracticeArea, practice_area_id)
 
 
-def create_practice_area(db: Session, data: schemas.PracticeAreaCreate) -> models.PracticeArea:
-    practice_area = models.PracticeArea(**data.dict())
+async def create_practice_area(db: AsyncSession, data: schemas.PracticeAreaCreate) -> models.PracticeArea:
+    practice_area = models.PracticeArea(**data.dict(exclude_unset=True))
     db.add(practice_area)
-    db.flush()
+    await db.flush()
     return practice_area
 
 
-def update_practice_area(
-    db: Session, instance: models.PracticeArea, data: schemas.PracticeAreaUpdate
-) -> models.PracticeArea:
-    update_data = data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(instance, key, value)
-    db.add(instance)
-    db.flush()
-    return instance
+async def update_practice_area(
+    db: AsyncSession, practice_area_id: int, data: schemas.PracticeAreaUpdate
+) -> Optional[models.PracticeArea]:
+    values = data.dict(exclude_unset=True)
+    if not values:
+        return await get_practice_area(db, practice_area_id)
+    stmt = (
+        update(models.PracticeArea)
+        .where(models.PracticeArea.id == practice_area_id)
+        .values(**values)
+        .returning(models.PracticeArea)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
-def delete_practice_area(db: Session, instance: models.PracticeArea) -> None:
-    db.delete(instance)
-    db.flush()
+async def delete_practice_area(db: AsyncSession, practice_area_id: int) -> bool:
+    # Case results of the area go with it, as the ORM cascade on PracticeArea.case_results did.
+    await db.execute(delete(models.CaseResult).where(models.CaseResult.practice_area_id == practice_area_id))
+    await db.execute(
+        delete(models.lawyer_practice_area).where(
+            models.lawyer_practice_area.c.practice_area_id == practice_area_id
+        )
+    )
+    result = await db.execute(delete(models.PracticeArea).where(models.PracticeArea.id == practice_area_id))
+    return result.rowcount > 0
 
 
 # Lawyer helpers ------------------------------------------------------------------
 
-def list_lawyers(
-    db: Session,
+async def list_lawyers(
+    db: AsyncSession,
     *,
     practice_area_id: Optional[int] = None,
     search: Optional[str] = None,
 ) -> Sequence[models.Lawyer]:
-    stmt = select(models.Lawyer).options(selectinload(models.Lawyer.practice_areas))
+    stmt = select(models.Lawyer).options(selectinload(models.Lawyer.practice_areas), raiseload("*"))
 
     if practice_area_id is not None:
-        stmt = stmt.join(models.Lawyer.practice_areas).where(models.PracticeArea.id == practice_area_id)
+        lawyer_ids = select(models.lawyer_practice_area.c.lawyer_id).where(
+            models.lawyer_practice_area.c.practice_area_id == practice_area_id
+        )
+        stmt = stmt.where(models.Lawyer.id.in_(lawyer_ids))
     if search:
-        search_term = f"%{search.lower()}%"
-        stmt = stmt.where(models.Lawyer.full_name.ilike(search_term) | models.Lawyer.bio.ilike(search_term))
+        # The SQLite trigram index only matches terms of at least three characters.
+        if (
+            models.lawyer_search_index_available
+            and db.get_bind().dialect.name == "sqlite"
+            and len(search) >= 3
+        ):
+            phrase = '"{}"'.format(search.replace('"', '""'))
+            lawyer_ids = select(models.lawyers_fts.c.rowid).where(models.lawyers_fts.c.lawyers_fts.match(phrase))
+            stmt = stmt.where(models.Lawyer.id.in_(lawyer_ids))
+        else:
+            search_term = f"%{search.lower()}%"
+            stmt = stmt.where(models.Lawyer.full_name.ilike(search_term) | models.Lawyer.bio.ilike(search_term))
 
     stmt = stmt.order_by(models.Lawyer.full_name)
-    return db.execute(stmt).scalars().unique().all()
+    return (await db.scalars(stmt)).all()
 
 
-def get_lawyer(db: Session, lawyer_id: int) -> Optional[models.Lawyer]:
+async def get_lawyer(db: AsyncSession, lawyer_id: int) -> Optional[models.Lawyer]:
+    # A single parent row is fetched, so joining its practice areas costs one statement
+    # instead of a second selectin round trip.
     stmt = (
         select(models.Lawyer)
-        .options(
-            selectinload(models.Lawyer.practice_areas),
-            selectinload(models.Lawyer.case_results),
-            selectinload(models.Lawyer.testimonials),
-        )
+        .options(joinedload(models.Lawyer.practice_areas), raiseload("*"))
         .where(models.Lawyer.id == lawyer_id)
     )
-    return db.execute(stmt).scalar_one_or_none()
+    return (await db.execute(stmt)).unique().scalar_one_or_none()
 
 
-def _attach_practice_areas(
-    db: Session, lawyer: models.Lawyer, practice_area_ids: Optional[List[int]]
+async def _attach_practice_areas(
+    db: AsyncSession, lawyer: models.Lawyer, practice_area_ids: Optional[List[int]]
 ) -> None:
     if practice_area_ids is None:
         return
     if not practice_area_ids:
-        lawyer.practice_areas.clear()
+        lawyer.practice_areas = []
         return
 
-    areas = (
-        db.execute(
-            select(models.PracticeArea).where(models.PracticeArea.id.in_(practice_area_ids))
-        )
-        .scalars()
-        .all()
-    )
-    lawyer.practice_areas = areas
-
-
-def create_lawyer(db: Session, data: schemas.LawyerCreate) -> models.Lawyer:
-    lawyer = models.Lawyer(
-        full_name=data.full_name,
-        title=data.title,
-        bio=data.bio,
-        email=data.email,
-        phone=data.phone,
-        experience_years=data.experience_years,
-        photo_url=data.photo_url,
-    )
+    # Reuse practice areas already in the identity map (e.g. the lawyer's current ones) and
+    # only select the rest. Assigning the collection emits just the junction rows that changed.
+    areas = {
+        area_id: db.identity_map.get(db.identity_key(models.PracticeArea, area_id))
+        for area_id in practice_area_ids
+    }
+    missing = [area_id for area_id, area in areas.items() if area is None]
+    if missing:
+        for area in await db.scalars(select(models.PracticeArea).where(models.PracticeArea.id.in_(missing))):
+            areas[area.id] = area
+    lawyer.practice_areas = [area for area in areas.values() if area is not None]
+
+
+async def create_lawyer(db: AsyncSession, data: schemas.LawyerCreate) -> models.Lawyer:
+    lawyer = models.Lawyer(**data.dict(exclude_unset=True, exclude={"languages", "practice_area_ids"}))
     lawyer.languages = data.languages
-    _attach_practice_areas(db, lawyer, data.practice_area_ids)
+    await _attach_practice_areas(db, lawyer, data.practice_area_ids)
     db.add(lawyer)
-    db.flush()
+    await db.flush()
     return lawyer
 
 
-def update_lawyer(db: Session, instance: models.Lawyer, data: schemas.LawyerUpdate) -> models.Lawyer:
-    update_data = data.dict(exclude_unset=True)
-    languages = update_data.pop("languages", None)
-    practice_area_ids = update_data.pop("practice_area_ids", None)
-
-    for key, value in update_data.items():
-        setattr(instance, key, value)
+async def update_lawyer(
+    db: AsyncSession, lawyer_id: int, data: schemas.LawyerUpdate
+) -> Optional[models.Lawyer]:
+    values = data.dict(exclude_unset=True, exclude={"languages", "practice_area_ids"})
+    if data.languages is not None:
+        values["languages"] = data.languages
+
+    if values:
+        stmt = (
+            update(models.Lawyer)
+            .where(models.Lawyer.id == lawyer_id)
+            .values(**values)
+            .returning(models.Lawyer)
+            .options(selectinload(models.Lawyer.practice_areas), raiseload("*"))
+        )
+        lawyer = (await db.execute(stmt)).scalar_one_or_none()
+    else:
+        lawyer = await get_lawyer(db, lawyer_id)
+    if lawyer is None:
+        return None
+
+    if data.practice_area_ids is not None:
+        await _attach_practice_areas(db, lawyer, data.practice_area_ids)
+        await db.flush()
+    return lawyer
 
-    if languages is not None:
-        instance.languages = languages
-    if practice_area_ids is not None:
-        _attach_practice_areas(db, instance, practice_area_ids)
 
-    db.add(instance)
-    db.flush()
-    return instance
+async def delete_lawyer(db: AsyncSession, lawyer_id: int) -> bool:
+    # One DELETE per dependent table instead of one per cascaded child object.
+    await db.execute(delete(models.CaseResult).where(models.CaseResult.lawyer_id == lawyer_id))
+    await db.execute(delete(models.Testimonial).where(models.Testimonial.lawyer_id == lawyer_id))
+    await db.execute(
+        delete(models.lawyer_practice_area).where(models.lawyer_practice_area.c.lawyer_id == lawyer_id)
+    )
+    result = await db.execute(delete(models.Lawyer).where(models.Lawyer.id == lawyer_id))
+    return result.rowcount > 0
 
 
-def delete_lawyer(db: Session, instance: models.Lawyer) -> None:
-    db.delete(instance)
-    db.flush()
+# Case results --------------------------------------------------------------------
 
+def _select_case_results_with_names() -> Select:
+    # Rows are (case_result, lawyer_name, practice_area_name). Responses only need the two
+    # names, so they are joined in instead of loading the relationships.
+    return (
+        select(models.CaseResult, models.Lawyer.full_name, models.PracticeArea.name)
+        .outerjoin(models.CaseResult.lawyer)
+        .outerjoin(models.CaseResult.practice_area)
+        .options(raiseload("*"))
+    )
 
-# Case results --------------------------------------------------------------------
 
-def list_case_results(db: Session) -> Sequence[models.CaseResult]:
-    stmt = (
-        select(models.CaseResult)
-        .options(selectinload(models.CaseResult.lawyer), selectinload(models.CaseResult.practice_area))
-        .order_by(models.CaseResult.resolved_on.desc().nullslast(), models.CaseResult.title)
+async def list_case_results(db: AsyncSession) -> Sequence[Row]:
+    stmt = _select_case_results_with_names().order_by(
+        models.CaseResult.resolved_on.desc().nullslast(), models.CaseResult.title
     )
-    return db.execute(stmt).scalars().all()
+    return (await db.execute(stmt)).all()
 
 
-def get_case_result(db: Session, case_result_id: int) -> Optional[models.CaseResult]:
+async def get_case_result(db: AsyncSession, case_result_id: int) -> Optional[Row]:
+    stmt = _select_case_results_with_names().where(models.CaseResult.id == case_result_id)
+    return (await db.execute(stmt)).one_or_none()
+
+
+async def create_case_result(db: AsyncSession, data: schemas.CaseResultCreate) -> models.CaseResult:
+    stmt = insert(models.CaseResult).values(**data.dict(exclude_unset=True)).returning(models.CaseResult)
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def update_case_result(
+    db: AsyncSession, case_result_id: int, data: schemas.CaseResultUpdate
+) -> Optional[models.CaseResult]:
+    values = data.dict(exclude_unset=True)
+    if not values:
+        return await db.get(models.CaseResult, case_result_id)
     stmt = (
-        select(models.CaseResult)
-        .options(selectinload(models.CaseResult.lawyer), selectinload(models.CaseResult.practice_area))
+        update(models.CaseResult)
         .where(models.CaseResult.id == case_result_id)
+        .values(**values)
+        .returning(models.CaseResult)
     )
-    return db.execute(stmt).scalar_one_or_none()
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
-def create_case_result(db: Session, data: schemas.CaseResultCreate) -> models.CaseResult:
-    case_result = models.CaseResult(**data.dict())
-    db.add(case_result)
-    db.flush()
-    return case_result
+async def delete_case_result(db: AsyncSession, case_result_id: int) -> bool:
+    result = await db.execute(delete(models.CaseResult).where(models.CaseResult.id == case_result_id))
+    return result.rowcount > 0
 
 
-def update_case_result(
-    db: Session, instance: models.CaseResult, data: schemas.CaseResultUpdate
-) -> models.CaseResult:
-    update_data = data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(instance, key, value)
-    db.add(instance)
-    db.flush()
-    return instance
+# Testimonials --------------------------------------------------------------------
 
+def _select_testimonials_with_names() -> Select:
+    # Rows are (testimonial, lawyer_name).
+    return (
+        select(models.Testimonial, models.Lawyer.full_name)
+        .outerjoin(models.Testimonial.lawyer)
+        .options(raiseload("*"))
+    )
 
-def delete_case_result(db: Session, instance: models.CaseResult) -> None:
-    db.delete(instance)
-    db.flush()
 
+async def list_testimonials(db: AsyncSession) -> Sequence[Row]:
+    stmt = _select_testimonials_with_names().order_by(models.Testimonial.id.desc())
+    return (await db.execute(stmt)).all()
 
-# Testimonials --------------------------------------------------------------------
 
-def list_testimonials(db: Session) -> Sequence[models.Testimonial]:
-    stmt = select(models.Testimonial).options(selectinload(models.Testimonial.lawyer)).order_by(
-        models.Testimonial.id.desc()
-    )
-    return db.execute(stmt).scalars().all()
+async def get_testimonial(db: AsyncSession, testimonial_id: int) -> Optional[Row]:
+    stmt = _select_testimonials_with_names().where(models.Testimonial.id == testimonial_id)
+    return (await db.execute(stmt)).one_or_none()
+
 
+async def create_testimonial(db: AsyncSession, data: schemas.TestimonialCreate) -> models.Testimonial:
+    stmt = insert(models.Testimonial).values(**data.dict(exclude_unset=True)).returning(models.Testimonial)
+    return (await db.execute(stmt)).scalar_one()
 
-def get_testimonial(db: Session, testimonial_id: int) -> Optional[models.Testimonial]:
+
+async def update_testimonial(
+    db: AsyncSession, testimonial_id: int, data: schemas.TestimonialUpdate
+) -> Optional[models.Testimonial]:
+    values = data.dict(exclude_unset=True)
+    if not values:
+        return await db.get(models.Testimonial, testimonial_id)
     stmt = (
-        select(models.Testimonial)
-        .options(selectinload(models.Testimonial.lawyer))
+        update(models.Testimonial)
         .where(models.Testimonial.id == testimonial_id)
+        .values(**values)
+        .returning(models.Testimonial)
     )
-    return db.execute(stmt).scalar_one_or_none()
-
+    return (await db.execute(stmt)).scalar_one_or_none()
 
-def create_testimonial(db: Session, data: schemas.TestimonialCreate) -> models.Testimonial:
-    testimonial = models.Testimonial(**data.dict())
-    db.add(testimonial)
-    db.flush()
-    return testimonial
 
+async def delete_testimonial(db: AsyncSession, testimonial_id: int) -> bool:
+    result = await db.execute(delete(models.Testimonial).where(models.Testimonial.id == testimonial_id))
+    return result.rowcount > 0
 
-def update_testimonial(
-    db: Session, instance: models.Testimonial, data: schemas.TestimonialUpdate
-) -> models.Testimonial:
-    update_data = data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(instance, key, value)
-    db.add(instance)
-    db.flush()
-    return instance
 
+# Contact messages ----------------------------------------------------------------
 
-def delete_testimonial(db: Session, instance: models.Testimonial) -> None:
-    db.delete(instance)
-    db.flush()
-
+async def stream_contact_messages(
+    db: AsyncSession, *, batch_size: int = 200
+) -> AsyncScalarResult[models.ContactMessage]:
+    stmt = (
+        select(models.ContactMessage)
+        .order_by(models.ContactMessage.created_at.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    return await db.stream_scalars(stmt)
 
-# Contact messages ----------------------------------------------------------------
 
-def list_contact_messages(db: Session) -> Sequence[models.ContactMessage]:
-    stmt = select(models.ContactMessage).order_by(models.ContactMessage.created_at.desc())
-    return db.execute(stmt).scalars().all()
+async def create_contact_message(db: AsyncSession, data: schemas.ContactMessageCreate) -> models.ContactMessage:
+    stmt = insert(models.ContactMessage).values(**data.dict(exclude_unset=True)).returning(models.ContactMessage)
+    return (await db.execute(stmt)).scalar_one()
 
 
-def create_contact_message(db: Session, data: schemas.ContactMessageCreate) -> models.ContactMessage:
-    message = models.ContactMessage(**data.dict())
-    db.add(message)
-    db.flush()
-    return message
+async def create_contact_messages_bulk(db: AsyncSession, items: Sequence[schemas.ContactMessageCreate]) -> None:
+    if not items:
+        return
+    await db.execute(insert(models.ContactMessage), [item.dict() for item in items])
@@ -1,54 +1,156 @@
 """Database configuration and utilities for the law firm backend."""
 from __future__ import annotations
 
+import logging
 import os
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from . import cache
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./law_firm.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# URLs for the synchronous drivers are mapped onto their asyncio counterparts.
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "sqlite+aiosqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "postgresql+asyncpg": "postgresql+asyncpg",
+}
+
+
+def _async_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    try:
+        return _ASYNC_DRIVERS[scheme] + separator + rest
+    except KeyError:
+        raise ValueError(
+            f"Unsupported DATABASE_URL scheme {scheme!r}; use SQLite (aiosqlite) "
+            "or PostgreSQL (asyncpg), e.g. sqlite:///./law_firm.db or postgresql://user@host/db"
+        ) from None
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _engine_options(url: str) -> dict:
+    """Return pool settings sized for concurrent requests, where each request holds a connection."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return {"pool_size": 20, "max_overflow": 40, "pool_pre_ping": True, "pool_recycle": 1800}
+
+    options: dict = {"connect_args": {"check_same_thread": False}}
+    if parsed.database in (None, "", ":memory:"):
+        # An in-memory database only exists inside its connection, so every session must share it.
+        options["poolclass"] = StaticPool
+    else:
+        # aiosqlite defaults to NullPool; keep connections (and their PRAGMAs) around instead.
+        options.update(poolclass=AsyncAdaptedQueuePool, pool_size=20, max_overflow=40)
+    return options
+
+
+engine = create_async_engine(_async_url(DATABASE_URL), **_engine_options(DATABASE_URL))
+
+# Attributes must stay readable after commit: an expired attribute cannot be lazily
+# reloaded outside of an awaited call.
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+# Read-only handlers share the pool but run in autocommit mode, so no BEGIN/COMMIT pair is issued.
+ReadSessionLocal = async_sessionmaker(
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT"), autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
+_db_initialized = False
 
-def init_db() -> None:
-    """Create database tables if they do not already exist."""
-    from . import models  # noqa: F401 - ensure models are imported for metadata
 
-    Base.metadata.create_all(bind=engine)
+if IS_SQLITE:
 
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """Tune every new SQLite connection for concurrent reads and fewer fsyncs."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
 
-def get_db() -> Generator[Session, None, None]:
+
+async def init_db() -> None:
+    """Create database tables if they do not already exist.
+
+    Only the first call in a process touches the database; later calls are no-ops.
+    """
+    global _db_initialized
+    if _db_initialized:
+        return
+
+    from . import models
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    # The search index is optional: SQLite's trigram tokenizer needs 3.34+, and pg_trgm needs
+    # CREATE privilege on the database. Without it search falls back to ILIKE filters.
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(models.create_lawyer_search_index)
+    except DBAPIError as exc:
+        logger.warning("Lawyer search index unavailable, falling back to ILIKE search: %s", exc)
+    else:
+        models.lawyer_search_index_available = True
+    _db_initialized = True
+
+
+def invalidate_cache_on_commit(db: AsyncSession) -> None:
+    """Mark the session's writes as affecting cached listings; get_db clears them on commit."""
+    db.info["invalidate_cache"] = True
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Provide a transactional scope around a series of operations."""
     db = SessionLocal()
     try:
         yield db
-        db.commit()
+        await db.commit()
+        # Only after the commit: a listing read before it would re-cache the old rows.
+        if db.info.get("invalidate_cache"):
+            cache.clear()
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_db_ro() -> AsyncGenerator[AsyncSession, None]:
+    """Provide a session for read-only handlers; there is nothing to commit or roll back."""
+    async with ReadSessionLocal() as db:
+        yield db
 
 
-@contextmanager
-def session_scope() -> Generator[Session, None, None]:
-    """Context manager that yields a database session and handles commit/rollback."""
+@asynccontextmanager
+async def session_scope() -> AsyncGenerator[AsyncSession, None]:
+    """Async context manager that yields a database session and handles commit/rollback."""
     session = SessionLocal()
     try:
         yield session
-        session.commit()
+        await session.commit()
+        cache.clear()
     except Exception:
-        session.rollback()
+        await session.rollback()
         raise
     finally:
-        session.close()
+        await session.close()
@@ -1,16 +1,19 @@
 """FastAPI application entry point for the law firm backend."""
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
+import orjson
 from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from . import crud, schemas
-from .database import get_db, init_db
+from . import cache, crud, schemas
+from .database import SessionLocal, get_db, get_db_ro, init_db, invalidate_cache_on_commit
 
-app = FastAPI(title="Law Firm Backend", version="1.0.0")
+app = FastAPI(title="Law Firm Backend", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,8 +25,8 @@ app.add_middleware(
 
 
 @app.on_event("startup")
-def on_startup() -> None:
-    init_db()
+async def on_startup() -> None:
+    await init_db()
 
 
 @app.get("/", summary="Genel bilgi")
@@ -42,9 +45,13 @@ def healthcheck() -> dict[str, str]:
 # Practice areas ------------------------------------------------------------------
 
 
+async def _read_practice_areas(db: AsyncSession) -> List[schemas.PracticeAreaRead]:
+    return [schemas.PracticeAreaRead.from_orm(item) for item in await crud.list_practice_areas(db)]
+
+
 @app.get("/practice-areas", response_model=List[schemas.PracticeAreaRead], summary="Uzmanlık alanlarını listele")
-def list_practice_areas(db: Session = Depends(get_db)):
-    return crud.list_practice_areas(db)
+async def list_practice_areas(db: AsyncSession = Depends(get_db_ro)):
+    return await cache.get_or_set(("practice-areas",), lambda: _read_practice_areas(db))
 
 
 @app.post(
@@ -53,8 +60,10 @@ def list_practice_areas(db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
     summary="Yeni uzmanlık alanı oluştur",
 )
-def create_practice_area(data: schemas.PracticeAreaCreate, db: Session = Depends(get_db)):
-    return crud.create_practice_area(db, data)
+async def create_practice_area(data: schemas.PracticeAreaCreate, db: AsyncSession = Depends(get_db)):
+    practice_area = await crud.create_practice_area(db, data)
+    invalidate_cache_on_commit(db)
+    return practice_area
 
 
 @app.get(
@@ -62,8 +71,8 @@ def create_practice_area(data: schemas.PracticeAreaCreate, db: Session = Depends
     response_model=schemas.PracticeAreaRead,
     summary="Uzmanlık alanı detayı",
 )
-def get_practice_area(practice_area_id: int, db: Session = Depends(get_db)):
-    instance = crud.get_practice_area(db, practice_area_id)
+async def get_practice_area(practice_area_id: int, db: AsyncSession = Depends(get_db_ro)):
+    instance = await crud.get_practice_area(db, practice_area_id)
     if not instance:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Uzmanlık alanı bulunamadı")
     return instance
@@ -74,196 +83,224 @@ def get_practice_area(practice_area_id: int, db: Session = Depends(get_db)):
     response_model=schemas.PracticeAreaRead,
     summary="Uzmanlık alanını güncelle",
 )
-def update_practice_area(
-    practice_area_id: int, data: schemas.PracticeAreaUpdate, db: Session = Depends(get_db)
+async def update_practice_area(
+    practice_area_id: int, data: schemas.PracticeAreaUpdate, db: AsyncSession = Depends(get_db)
 ):
-    instance = crud.get_practice_area(db, practice_area_id)
-    if not instance:
+    practice_area = await crud.update_practice_area(db, practice_area_id, data)
+    if not practice_area:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Uzmanlık alanı bulunamadı")
-    return crud.update_practice_area(db, instance, data)
+    invalidate_cache_on_commit(db)
+    return practice_area
 
 
 @app.delete(
     "/practice-areas/{practice_area_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Uzmanlık alanını sil"
 )
-def delete_practice_area(practice_area_id: int, db: Session = Depends(get_db)):
-    instance = crud.get_practice_area(db, practice_area_id)
-    if not instance:
+async def delete_practice_area(practice_area_id: int, db: AsyncSession = Depends(get_db)):
+    if not await crud.delete_practice_area(db, practice_area_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Uzmanlık alanı bulunamadı")
-    crud.delete_practice_area(db, instance)
+    invalidate_cache_on_commit(db)
     return None
 
 
 # Lawyers -------------------------------------------------------------------------
 
 
+async def _read_lawyers(
+    db: AsyncSession, practice_area_id: Optional[int], search: Optional[str]
+) -> List[schemas.LawyerRead]:
+    lawyers = await crud.list_lawyers(db, practice_area_id=practice_area_id, search=search)
+    return [schemas.LawyerRead.from_orm(lawyer) for lawyer in lawyers]
+
+
 @app.get(
     "/lawyers",
     response_model=List[schemas.LawyerRead],
     summary="Avukatları listele",
 )
-def list_lawyers(
+async def list_lawyers(
     practice_area_id: Optional[int] = Query(None, alias="practiceAreaId"),
     search: Optional[str] = Query(None, description="İsim veya biyografide arama"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db_ro),
 ):
-    return crud.list_lawyers(db, practice_area_id=practice_area_id, search=search)
+    return await cache.get_or_set(
+        ("lawyers", practice_area_id, search), lambda: _read_lawyers(db, practice_area_id, search)
+    )
 
 
 @app.post("/lawyers", response_model=schemas.LawyerRead, status_code=status.HTTP_201_CREATED)
-def create_lawyer(data: schemas.LawyerCreate, db: Session = Depends(get_db)):
-    return crud.create_lawyer(db, data)
+async def create_lawyer(data: schemas.LawyerCreate, db: AsyncSession = Depends(get_db)):
+    lawyer = await crud.create_lawyer(db, data)
+    invalidate_cache_on_commit(db)
+    return lawyer
 
 
 @app.get("/lawyers/{lawyer_id}", response_model=schemas.LawyerRead)
-def get_lawyer(lawyer_id: int, db: Session = Depends(get_db)):
-    instance = crud.get_lawyer(db, lawyer_id)
+async def get_lawyer(lawyer_id: int, db: AsyncSession = Depends(get_db_ro)):
+    instance = await crud.get_lawyer(db, lawyer_id)
     if not instance:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avukat bulunamadı")
     return instance
 
 
 @app.put("/lawyers/{lawyer_id}", response_model=schemas.LawyerRead)
-def update_lawyer(lawyer_id: int, data: schemas.LawyerUpdate, db: Session = Depends(get_db)):
-    instance = crud.get_lawyer(db, lawyer_id)
-    if not instance:
+async def update_lawyer(lawyer_id: int, data: schemas.LawyerUpdate, db: AsyncSession = Depends(get_db)):
+    lawyer = await crud.update_lawyer(db, lawyer_id, data)
+    if not lawyer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avukat bulunamadı")
-    return crud.update_lawyer(db, instance, data)
+    invalidate_cache_on_commit(db)
+    return lawyer
 
 
 @app.delete("/lawyers/{lawyer_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_lawyer(lawyer_id: int, db: Session = Depends(get_db)):
-    instance = crud.get_lawyer(db, lawyer_id)
-    if not instance:
+async def delete_lawyer(lawyer_id: int, db: AsyncSession = Depends(get_db)):
+    if not await crud.delete_lawyer(db, lawyer_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avukat bulunamadı")
-    crud.delete_lawyer(db, instance)
+    invalidate_cache_on_commit(db)
     return None
 
 
 # Case results --------------------------------------------------------------------
 
 
+def _case_result_read(row: Row) -> schemas.CaseResultRead:
+    # Rows come straight from the database, so skip from_orm/copy validation for each one.
+    result, lawyer_name, practice_area_name = row
+    return schemas.CaseResultRead.construct(
+        id=result.id,
+        title=result.title,
+        summary=result.summary,
+        outcome=result.outcome,
+        resolved_on=result.resolved_on,
+        lawyer_id=result.lawyer_id,
+        practice_area_id=result.practice_area_id,
+        lawyer_name=lawyer_name,
+        practice_area_name=practice_area_name,
+    )
+
+
+async def _read_case_results(db: AsyncSession) -> List[schemas.CaseResultRead]:
+    return [_case_result_read(row) for row in await crud.list_case_results(db)]
+
+
 @app.get("/case-results", response_model=List[schemas.CaseResultRead])
-def list_case_results(db: Session = Depends(get_db)):
-    results = crud.list_case_results(db)
-    return [
-        schemas.CaseResultRead.from_orm(result).copy(
-            update={
-                "lawyer_name": result.lawyer.full_name if result.lawyer else None,
-                "practice_area_name": result.practice_area.name if result.practice_area else None,
-            }
-        )
-        for result in results
-    ]
+async def list_case_results(db: AsyncSession = Depends(get_db_ro)):
+    return await cache.get_or_set(("case-results",), lambda: _read_case_results(db))
 
 
 @app.post("/case-results", response_model=schemas.CaseResultRead, status_code=status.HTTP_201_CREATED)
-def create_case_result(data: schemas.CaseResultCreate, db: Session = Depends(get_db)):
-    result = crud.create_case_result(db, data)
-    db.refresh(result)
-    return schemas.CaseResultRead.from_orm(result).copy(
-        update={
-            "lawyer_name": result.lawyer.full_name if result.lawyer else None,
-            "practice_area_name": result.practice_area.name if result.practice_area else None,
-        }
-    )
+async def create_case_result(data: schemas.CaseResultCreate, db: AsyncSession = Depends(get_db)):
+    result = await crud.create_case_result(db, data)
+    invalidate_cache_on_commit(db)
+    return _case_result_read(await crud.get_case_result(db, result.id))
 
 
 @app.get("/case-results/{case_result_id}", response_model=schemas.CaseResultRead)
-def get_case_result(case_result_id: int, db: Session = Depends(get_db)):
-    result = crud.get_case_result(db, case_result_id)
-    if not result:
+async def get_case_result(case_result_id: int, db: AsyncSession = Depends(get_db_ro)):
+    row = await crud.get_case_result(db, case_result_id)
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Başarı hikayesi bulunamadı")
-    return schemas.CaseResultRead.from_orm(result).copy(
-        update={
-            "lawyer_name": result.lawyer.full_name if result.lawyer else None,
-            "practice_area_name": result.practice_area.name if result.practice_area else None,
-        }
-    )
+    return _case_result_read(row)
 
 
 @app.put("/case-results/{case_result_id}", response_model=schemas.CaseResultRead)
-def update_case_result(case_result_id: int, data: schemas.CaseResultUpdate, db: Session = Depends(get_db)):
-    instance = crud.get_case_result(db, case_result_id)
-    if not instance:
+async def update_case_result(
+    case_result_id: int, data: schemas.CaseResultUpdate, db: AsyncSession = Depends(get_db)
+):
+    if not await crud.update_case_result(db, case_result_id, data):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Başarı hikayesi bulunamadı")
-    result = crud.update_case_result(db, instance, data)
-    db.refresh(result)
-    return schemas.CaseResultRead.from_orm(result).copy(
-        update={
-            "lawyer_name": result.lawyer.full_name if result.lawyer else None,
-            "practice_area_name": result.practice_area.name if result.practice_area else None,
-        }
-    )
+    invalidate_cache_on_commit(db)
+    return _case_result_read(await crud.get_case_result(db, case_result_id))
 
 
 @app.delete("/case-results/{case_result_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_case_result(case_result_id: int, db: Session = Depends(get_db)):
-    instance = crud.get_case_result(db, case_result_id)
-    if not instance:
+async def delete_case_result(case_result_id: int, db: AsyncSession = Depends(get_db)):
+    if not await crud.delete_case_result(db, case_result_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Başarı hikayesi bulunamadı")
-    crud.delete_case_result(db, instance)
+    invalidate_cache_on_commit(db)
     return None
 
 
 # Testimonials --------------------------------------------------------------------
 
 
+def _testimonial_read(row: Row) -> schemas.TestimonialRead:
+    testimonial, lawyer_name = row
+    return schemas.TestimonialRead.construct(
+        id=testimonial.id,
+        client_name=testimonial.client_name,
+        content=testimonial.content,
+        rating=testimonial.rating,
+        lawyer_id=testimonial.lawyer_id,
+        lawyer_name=lawyer_name,
+    )
+
+
+async def _read_testimonials(db: AsyncSession) -> List[schemas.TestimonialRead]:
+    return [_testimonial_read(row) for row in await crud.list_testimonials(db)]
+
+
 @app.get("/testimonials", response_model=List[schemas.TestimonialRead])
-def list_testimonials(db: Session = Depends(get_db)):
-    testimonials = crud.list_testimonials(db)
-    return [
-        schemas.TestimonialRead.from_orm(item).copy(update={"lawyer_name": item.lawyer.full_name})
-        for item in testimonials
-    ]
+async def list_testimonials(db: AsyncSession = Depends(get_db_ro)):
+    return await cache.get_or_set(("testimonials",), lambda: _read_testimonials(db))
 
 
 @app.post("/testimonials", response_model=schemas.TestimonialRead, status_code=status.HTTP_201_CREATED)
-def create_testimonial(data: schemas.TestimonialCreate, db: Session = Depends(get_db)):
-    testimonial = crud.create_testimonial(db, data)
-    db.refresh(testimonial)
-    return schemas.TestimonialRead.from_orm(testimonial).copy(
-        update={"lawyer_name": testimonial.lawyer.full_name if testimonial.lawyer else None}
-    )
+async def create_testimonial(data: schemas.TestimonialCreate, db: AsyncSession = Depends(get_db)):
+    testimonial = await crud.create_testimonial(db, data)
+    invalidate_cache_on_commit(db)
+    return _testimonial_read(await crud.get_testimonial(db, testimonial.id))
 
 
 @app.get("/testimonials/{testimonial_id}", response_model=schemas.TestimonialRead)
-def get_testimonial(testimonial_id: int, db: Session = Depends(get_db)):
-    testimonial = crud.get_testimonial(db, testimonial_id)
-    if not testimonial:
+async def get_testimonial(testimonial_id: int, db: AsyncSession = Depends(get_db_ro)):
+    row = await crud.get_testimonial(db, testimonial_id)
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Geri bildirim bulunamadı")
-    return schemas.TestimonialRead.from_orm(testimonial).copy(
-        update={"lawyer_name": testimonial.lawyer.full_name if testimonial.lawyer else None}
-    )
+    return _testimonial_read(row)
 
 
 @app.put("/testimonials/{testimonial_id}", response_model=schemas.TestimonialRead)
-def update_testimonial(testimonial_id: int, data: schemas.TestimonialUpdate, db: Session = Depends(get_db)):
-    instance = crud.get_testimonial(db, testimonial_id)
-    if not instance:
+async def update_testimonial(
+    testimonial_id: int, data: schemas.TestimonialUpdate, db: AsyncSession = Depends(get_db)
+):
+    if not await crud.update_testimonial(db, testimonial_id, data):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Geri bildirim bulunamadı")
-    testimonial = crud.update_testimonial(db, instance, data)
-    db.refresh(testimonial)
-    return schemas.TestimonialRead.from_orm(testimonial).copy(
-        update={"lawyer_name": testimonial.lawyer.full_name if testimonial.lawyer else None}
-    )
+    invalidate_cache_on_commit(db)
+    return _testimonial_read(await crud.get_testimonial(db, testimonial_id))
 
 
 @app.delete("/testimonials/{testimonial_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_testimonial(testimonial_id: int, db: Session = Depends(get_db)):
-    instance = crud.get_testimonial(db, testimonial_id)
-    if not instance:
+async def delete_testimonial(testimonial_id: int, db: AsyncSession = Depends(get_db)):
+    if not await crud.delete_testimonial(db, testimonial_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Geri bildirim bulunamadı")
-    crud.delete_testimonial(db, instance)
+    invalidate_cache_on_commit(db)
     return None
 
 
 # Contact messages ----------------------------------------------------------------
 
 
+async def _stream_contact_messages() -> AsyncIterator[bytes]:
+    # The body is produced after the handler returns, when any dependency session is already
+    # closed, so the stream owns its session. It stays transactional rather than autocommit:
+    # asyncpg only opens the server-side cursor behind yield_per inside a transaction.
+    # Rows are encoded one yield_per batch at a time.
+    fields = list(schemas.ContactMessageRead.__fields__)
+    async with SessionLocal() as db:
+        yield b"["
+        separator = b""
+        async for batch in (await crud.stream_contact_messages(db)).partitions():
+            yield separator + b",".join(
+                orjson.dumps({name: getattr(message, name) for name in fields}) for message in batch
+            )
+            separator = b","
+        yield b"]"
+
+
 @app.get("/contact-messages", response_model=List[schemas.ContactMessageRead])
-def list_contact_messages(db: Session = Depends(get_db)):
-    return crud.list_contact_messages(db)
+async def list_contact_messages():
+    return StreamingResponse(_stream_contact_messages(), media_type="application/json")
 
 
 @app.post(
@@ -271,7 +308,5 @@ def list_contact_messages(db: Session = Depends(get_db)):
     response_model=schemas.ContactMessageRead,
     status_code=status.HTTP_201_CREATED,
 )
-def create_contact_message(data: schemas.ContactMessageCreate, db: Session = Depends(get_db)):
-    message = crud.create_contact_message(db, data)
-    db.refresh(message)
-    return message
+async def create_contact_message(data: schemas.ContactMessageCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_contact_message(db, data)
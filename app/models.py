@@ -1,20 +1,23 @@
 """SQLAlchemy models for the law firm backend."""
 from __future__ import annotations
 
-import json
 from datetime import datetime
-from typing import List
 
 from sqlalchemy import (
     Column,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
     Table,
     Text,
+    column,
+    table,
 )
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -26,44 +29,35 @@ lawyer_practice_area = Table(
     Column("practice_area_id", ForeignKey("practice_areas.id"), primary_key=True),
 )
 
+# The composite primary key leads with lawyer_id; lookups by practice area need their own index.
+Index("ix_lpa_practice_area_id", lawyer_practice_area.c.practice_area_id)
+
 
 class Lawyer(Base):
     __tablename__ = "lawyers"
 
     id = Column(Integer, primary_key=True, index=True)
-    full_name = Column(String(255), nullable=False)
+    full_name = Column(String(255), nullable=False, index=True)
     title = Column(String(255), nullable=True)
     bio = Column(Text, nullable=True)
     email = Column(String(255), nullable=True, unique=True)
     phone = Column(String(50), nullable=True)
     experience_years = Column(Integer, nullable=True)
     photo_url = Column(String(512), nullable=True)
-    _languages = Column("languages", Text, default="[]", nullable=False)
+    languages = Column(JSON, default=list, nullable=False)
 
     practice_areas = relationship(
         "PracticeArea",
         secondary=lawyer_practice_area,
         back_populates="lawyers",
-        lazy="selectin",
     )
     case_results = relationship(
-        "CaseResult", back_populates="lawyer", cascade="all, delete-orphan", lazy="selectin"
+        "CaseResult", back_populates="lawyer", cascade="all, delete-orphan"
     )
     testimonials = relationship(
-        "Testimonial", back_populates="lawyer", cascade="all, delete-orphan", lazy="selectin"
+        "Testimonial", back_populates="lawyer", cascade="all, delete-orphan"
     )
 
-    @property
-    def languages(self) -> List[str]:
-        try:
-            return json.loads(self._languages)
-        except json.JSONDecodeError:
-            return []
-
-    @languages.setter
-    def languages(self, value: List[str]) -> None:
-        self._languages = json.dumps(value or [])
-
     def __repr__(self) -> str:  # pragma: no cover - repr for debugging only
         return f"<Lawyer id={self.id} name={self.full_name!r}>"
 
@@ -79,10 +73,9 @@ class PracticeArea(Base):
         "Lawyer",
         secondary=lawyer_practice_area,
         back_populates="practice_areas",
-        lazy="selectin",
     )
     case_results = relationship(
-        "CaseResult", back_populates="practice_area", cascade="all, delete-orphan", lazy="selectin"
+        "CaseResult", back_populates="practice_area", cascade="all, delete-orphan"
     )
 
     def __repr__(self) -> str:  # pragma: no cover - repr for debugging only
@@ -96,7 +89,7 @@ class CaseResult(Base):
     title = Column(String(255), nullable=False)
     summary = Column(Text, nullable=True)
     outcome = Column(Text, nullable=True)
-    resolved_on = Column(Date, nullable=True)
+    resolved_on = Column(Date, nullable=True, index=True)
 
     lawyer_id = Column(Integer, ForeignKey("lawyers.id"), nullable=False)
     practice_area_id = Column(Integer, ForeignKey("practice_areas.id"), nullable=True)
@@ -133,7 +126,67 @@ class ContactMessage(Base):
     phone = Column(String(50), nullable=True)
     preferred_contact_method = Column(String(50), nullable=True)
     message = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     def __repr__(self) -> str:  # pragma: no cover - repr for debugging only
         return f"<ContactMessage id={self.id} email={self.email!r}>"
+
+
+# Lawyer search ---------------------------------------------------------------------
+
+# SQLite: an external-content FTS5 table over lawyers.full_name/bio, kept in sync by triggers.
+# The trigram tokenizer keeps the substring semantics of the previous ILIKE '%term%' search.
+lawyers_fts = table("lawyers_fts", column("rowid"), column("lawyers_fts"))
+
+# Set by database.init_db once the index exists; until then lawyer search uses ILIKE.
+lawyer_search_index_available = False
+
+_SQLITE_LAWYER_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE lawyers_fts USING fts5(
+        full_name, bio, content='lawyers', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER lawyers_fts_ai AFTER INSERT ON lawyers BEGIN
+        INSERT INTO lawyers_fts(rowid, full_name, bio) VALUES (new.id, new.full_name, new.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER lawyers_fts_ad AFTER DELETE ON lawyers BEGIN
+        INSERT INTO lawyers_fts(lawyers_fts, rowid, full_name, bio)
+        VALUES ('delete', old.id, old.full_name, old.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER lawyers_fts_au AFTER UPDATE OF full_name, bio ON lawyers BEGIN
+        INSERT INTO lawyers_fts(lawyers_fts, rowid, full_name, bio)
+        VALUES ('delete', old.id, old.full_name, old.bio);
+        INSERT INTO lawyers_fts(rowid, full_name, bio) VALUES (new.id, new.full_name, new.bio);
+    END
+    """,
+    "INSERT INTO lawyers_fts(lawyers_fts) VALUES ('rebuild')",
+)
+
+# PostgreSQL: trigram GIN indexes let the existing ILIKE '%term%' filters use an index.
+_POSTGRES_LAWYER_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_lawyers_full_name_trgm ON lawyers USING gin (full_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_lawyers_bio_trgm ON lawyers USING gin (bio gin_trgm_ops)",
+)
+
+
+def create_lawyer_search_index(connection: Connection) -> None:
+    """Create the dialect-specific structures backing lawyer search if they are missing."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lawyers_fts'"
+        ).first()
+        if exists:
+            return
+        for statement in _SQLITE_LAWYER_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_LAWYER_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
@@ -75,7 +75,7 @@ class LawyerRead(BaseModel):
     full_name: str
     title: Optional[str]
     bio: Optional[str]
-    email: Optional[EmailStr]
+    email: Optional[str]  # validated as EmailStr on write; trusted when read back
     phone: Optional[str]
     experience_years: Optional[int]
     photo_url: Optional[str]